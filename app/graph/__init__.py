@@ -2,6 +2,15 @@
 LangGraph orchestrator for Ticket Triage.
 """
 
-from app.graph.workflow import create_graph, graph
+from app.graph.workflow import ROUTERS, create_graph
 
-__all__ = ["create_graph", "graph"]
+__all__ = ["ROUTERS", "create_graph", "graph"]
+
+
+def __getattr__(name: str):
+    # Defer compiling the default graph until it is actually requested.
+    if name == "graph":
+        from app.graph import workflow
+
+        return workflow.graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
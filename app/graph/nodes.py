@@ -5,11 +5,11 @@ Each node is a function that takes the current state and returns
 a partial state update.
 """
 
-import json
 import os
 import re
 from typing import Any
 
+import orjson
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.messages.utils import trim_messages, count_tokens_approximately
 from langchain_openai import ChatOpenAI
@@ -21,6 +21,7 @@ from app.graph.tools import fetch_order, search_orders
 # LLM instance - lazy initialized
 _llm = None
 _templates_cache: list[dict] | None = None
+_JSON_OBJ_RE = re.compile(r"\{.*\}", re.DOTALL)
 
 
 def _coerce_draft_scenario(value: Any) -> DraftScenario:
@@ -64,15 +65,15 @@ def load_templates() -> list[dict]:
     """Load reply templates from mock data."""
     global _templates_cache
     if _templates_cache is None:
-        with open(os.path.join(MOCK_DIR, "replies.json"), "r", encoding="utf-8") as f:
-            _templates_cache = json.load(f)
+        with open(os.path.join(MOCK_DIR, "replies.json"), "rb") as f:
+            _templates_cache = orjson.loads(f.read())
     return _templates_cache
 
 
 def load_issues() -> list[dict]:
     """Load issue classification rules from mock data."""
-    with open(os.path.join(MOCK_DIR, "issues.json"), "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(os.path.join(MOCK_DIR, "issues.json"), "rb") as f:
+        return orjson.loads(f.read())
 
 
 def check_issue_keywords(text: str) -> bool:
@@ -332,19 +333,55 @@ def prepare_action(state: GraphState) -> dict[str, Any]:
     }
 
 
+def resolve_and_prepare(state: GraphState) -> dict[str, Any]:
+    """
+    Fused node: resolve_order followed by prepare_action in one graph step.
+
+    The two nodes always run back to back, so they are executed in-process
+    to avoid an extra scheduler hop and checkpoint write between them.
+
+    Args:
+        state: Current graph state.
+
+    Returns:
+        Merged partial state update from both nodes.
+    """
+    update = resolve_order(state)
+    update.update(prepare_action({**state, **update}))
+    return update
+
+
+def classify_resolve_and_prepare(state: GraphState) -> dict[str, Any]:
+    """
+    Fused node: classify_issue, resolve_order and prepare_action in one graph step.
+
+    Used for the FULL and RECLASSIFY paths, where the three nodes always run
+    in strict sequence without any branching between them.
+
+    Args:
+        state: Current graph state.
+
+    Returns:
+        Merged partial state update from all three nodes.
+    """
+    update = classify_issue(state)
+    update.update(resolve_and_prepare({**state, **update}))
+    return update
+
+
 def _safe_json_object(text: str) -> dict[str, Any]:
     """Parse JSON object safely from a model response."""
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         pass
 
-    match = re.search(r"\{.*\}", text, re.DOTALL)
+    match = _JSON_OBJ_RE.search(text)
     if not match:
         return {}
     try:
-        return json.loads(match.group(0))
-    except json.JSONDecodeError:
+        return orjson.loads(match.group(0))
+    except orjson.JSONDecodeError:
         return {}
 
 
@@ -397,10 +434,10 @@ Low-confidence examples:
 
 Issue type: {issue_type}
 Customer request: {ticket_text}
-Order details JSON: {json.dumps(order_details, ensure_ascii=True)}
+Order details JSON: {orjson.dumps(order_details).decode()}
 Suggested action: {suggested_action}
 Policy evaluation: {policy_evaluation}
-Applied policies JSON: {json.dumps(applied_policies, ensure_ascii=True)}
+Applied policies JSON: {orjson.dumps(applied_policies).decode()}
 
 Return STRICT JSON only:
 {{
@@ -446,6 +483,14 @@ Return STRICT JSON only:
         }
 
 
+# Review status written back for each REPLY draft phase.
+_PHASE_REVIEW_STATUS: dict[str, ReviewStatus] = {
+    "pending": ReviewStatus.PENDING,
+    "approved": ReviewStatus.APPROVED,
+    "rejected": ReviewStatus.REJECTED,
+}
+
+
 def _resolve_draft_phase(
     scenario: DraftScenario,
     issue_type: str | None,
@@ -882,32 +927,12 @@ def draft_reply(state: GraphState) -> dict[str, Any]:
             recommendation=recommendation,
             review_status=None,
         )
-    if phase == "pending":
-        return _build_reply_update(
-            draft=draft,
-            evidence=evidence,
-            recommendation=recommendation,
-            review_status=ReviewStatus.PENDING,
-        )
-    if phase == "approved":
-        return _build_reply_update(
-            draft=draft,
-            evidence=evidence,
-            recommendation=recommendation,
-            review_status=ReviewStatus.APPROVED,
-        )
-    if phase == "rejected":
-        return _build_reply_update(
-            draft=draft,
-            evidence=evidence,
-            recommendation=recommendation,
-            review_status=ReviewStatus.REJECTED,
-        )
+    # Remaining REPLY phases map straight to a review status; non-REPLY -> None
     return _build_reply_update(
         draft=draft,
         evidence=evidence,
         recommendation=recommendation,
-        review_status=None,
+        review_status=_PHASE_REVIEW_STATUS.get(phase),
     )
 
 
@@ -919,8 +944,8 @@ def admin_review(state: GraphState) -> dict[str, Any]:
     The review_status and admin_feedback are set externally by the API before resuming.
     
     This is a pass-through node that validates the review_status was set.
-    The actual routing decision is made by route_after_admin_review, which always
-    goes to draft_reply to generate the appropriate response based on review_status.
+    The graph then follows an unconditional edge to draft_reply, which generates
+    the appropriate response based on review_status.
     
     Args:
         state: Current graph state.
@@ -7,12 +7,18 @@ from langchain_core.tools import tool
 
 # Placeholder for ORDERS data - will be loaded from mock_data
 ORDERS: list[dict] = []
+ORDERS_BY_ID: dict[str, dict] = {}
+ORDERS_BY_EMAIL: dict[str, list[dict]] = {}
 
 
 def load_orders(orders_data: list[dict]) -> None:
-    """Load orders data into the module."""
-    global ORDERS
+    """Load orders data into the module and build the lookup indexes."""
+    global ORDERS, ORDERS_BY_ID, ORDERS_BY_EMAIL
     ORDERS = orders_data
+    ORDERS_BY_ID = {order["order_id"]: order for order in orders_data}
+    ORDERS_BY_EMAIL = {}
+    for order in orders_data:
+        ORDERS_BY_EMAIL.setdefault(order["email"].lower(), []).append(order)
 
 
 @tool
@@ -26,10 +32,7 @@ def fetch_order(order_id: str) -> Optional[dict]:
     Returns:
         Order details as a dictionary, or None if not found.
     """
-    for order in ORDERS:
-        if order["order_id"] == order_id:
-            return order
-    return None
+    return ORDERS_BY_ID.get(order_id)
 
 
 @tool
@@ -43,7 +46,7 @@ def search_orders(email: str) -> list[dict]:
     Returns:
         List of orders matching the email (case-insensitive).
     """
-    return [o for o in ORDERS if o["email"].lower() == email.lower()]
+    return list(ORDERS_BY_EMAIL.get(email.lower(), []))
 
 
 # List of tools available for the agent
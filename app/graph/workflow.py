@@ -8,6 +8,7 @@ This workflow implements a deterministic routing system with:
 - HITL (Human-in-the-Loop) admin review for reply scenarios
 """
 
+from functools import lru_cache
 from typing import Literal
 from langgraph.graph import StateGraph, START, END
 
@@ -15,9 +16,8 @@ from app.graph.state import GraphState
 from app.schema import ReviewStatus, DraftScenario, RoutePath
 from app.graph.nodes import (
     ingest,
-    classify_issue,
-    resolve_order,
-    prepare_action,
+    classify_resolve_and_prepare,
+    resolve_and_prepare,
     decision_maker,
     draft_reply,
     admin_review,
@@ -27,10 +27,12 @@ from app.rag.rag_nodes import kb_orchestrator, policy_evaluator
 
 
 # Type aliases for routing return types
-RouteAfterIngest = Literal["classify_issue", "resolve_order", "draft_reply"]
+RouteAfterIngest = Literal["classify_resolve_and_prepare", "resolve_and_prepare", "draft_reply"]
 RouteAfterPrepareAction = Literal["kb_orchestrator", "draft_reply"]
 RouteAfterDraft = Literal["admin_review", "finalize", "__end__"]
-RouteAfterAdminReview = Literal["draft_reply"]
+
+# Shared immutable default for compile_graph(); never mutate.
+_EMPTY_INTERRUPT: tuple[str, ...] = ()
 
 
 def route_after_ingest(state: GraphState) -> RouteAfterIngest:
@@ -38,8 +40,8 @@ def route_after_ingest(state: GraphState) -> RouteAfterIngest:
     Route based on ingest analysis for multi-turn conversation support.
     
     Routing logic:
-    - FULL / RECLASSIFY → classify_issue (continue normal classification flow)
-    - RESOLVE → resolve_order (skip classification, go to resolution)
+    - FULL / RECLASSIFY → classify_resolve_and_prepare (classify, resolve, prepare)
+    - RESOLVE → resolve_and_prepare (skip classification, go to resolution)
     - DRAFT → draft_reply (skip to draft, use existing context)
     
     Args:
@@ -51,13 +53,38 @@ def route_after_ingest(state: GraphState) -> RouteAfterIngest:
     route_path = state.get("route_path", RoutePath.FULL)
     
     if route_path in (RoutePath.FULL, RoutePath.RECLASSIFY):
-        return "classify_issue"
+        return "classify_resolve_and_prepare"
     elif route_path == RoutePath.RESOLVE:
-        return "resolve_order"
+        return "resolve_and_prepare"
     else:
         return "draft_reply"
 
 
+def _compute_route_after_draft(
+    scenario: DraftScenario | None,
+    review_status: ReviewStatus | None,
+) -> RouteAfterDraft:
+    """Routing decision after draft_reply for one (scenario, review_status) pair."""
+    # Other scenarios don't need admin approval - return to user
+    if scenario != DraftScenario.REPLY:
+        return END
+    # Second run after admin review - finalize
+    if review_status in (ReviewStatus.APPROVED, ReviewStatus.REJECTED):
+        return "finalize"
+    # First run (PENDING or None) - go to admin_review for HITL
+    return "admin_review"
+
+
+# Full (scenario, review_status) decision table, built once at import.
+# str-based enums hash and compare like their values, so checkpoint-restored
+# plain strings resolve to the same entries.
+_DRAFT_ROUTES: dict[tuple, RouteAfterDraft] = {
+    (scenario, review_status): _compute_route_after_draft(scenario, review_status)
+    for scenario in (None, *DraftScenario)
+    for review_status in (None, *ReviewStatus)
+}
+
+
 def route_after_draft(state: GraphState) -> RouteAfterDraft:
     """
     Route after draft based on the scenario and review_status.
@@ -74,20 +101,12 @@ def route_after_draft(state: GraphState) -> RouteAfterDraft:
     Returns:
         Next node name or END.
     """
-    scenario = state.get("draft_scenario")
-    review_status = state.get("review_status")
-    
-    if scenario == DraftScenario.REPLY:
-        # Check if already reviewed by admin
-        if review_status in (ReviewStatus.APPROVED, ReviewStatus.REJECTED):
-            # Second run after admin review - finalize
-            return "finalize"
-        else:
-            # First run (PENDING or None) - go to admin_review for HITL
-            return "admin_review"
-    else:
-        # Other scenarios don't need admin approval - return to user
-        return END
+    key = (state.get("draft_scenario"), state.get("review_status"))
+    route = _DRAFT_ROUTES.get(key)
+    if route is None:
+        # Unexpected stored value - fall back to the direct computation
+        route = _compute_route_after_draft(*key)
+    return route
 
 
 def route_to_rag(state: GraphState) -> RouteAfterPrepareAction:
@@ -103,22 +122,12 @@ def route_to_rag(state: GraphState) -> RouteAfterPrepareAction:
     return "draft_reply"
 
 
-def route_after_admin_review(state: GraphState) -> RouteAfterAdminReview:
-    """
-    Route after admin review.
-    
-    Always routes to draft_reply to generate the appropriate response
-    based on review_status (set by API):
-    - APPROVED -> draft_reply generates approved action message
-    - REJECTED -> draft_reply generates rejection message
-    
-    Args:
-        state: Current graph state.
-        
-    Returns:
-        Next node name (always draft_reply).
-    """
-    return "draft_reply"
+# Public router table so routing logic can be exercised without building a StateGraph.
+ROUTERS = {
+    "after_ingest": route_after_ingest,
+    "after_draft": route_after_draft,
+    "to_rag": route_to_rag,
+}
 
 
 def create_graph() -> StateGraph:
@@ -128,10 +137,17 @@ def create_graph() -> StateGraph:
     Smart Routing Flow:
     ```
     START -> ingest -> route_after_ingest
-      |-> classify_issue (FULL/RECLASSIFY) -> resolve_order -> prepare_action -> draft_reply
-      |-> resolve_order (RESOLVE) -> prepare_action -> draft_reply
+      |-> classify_resolve_and_prepare (FULL/RECLASSIFY) -> route_to_rag
+      |-> resolve_and_prepare (RESOLVE) -> route_to_rag
       |-> draft_reply (DRAFT - continuation)
     
+    route_to_rag:
+      |-> kb_orchestrator -> policy_evaluator -> decision_maker -> draft_reply (REPLY)
+      |-> draft_reply (other scenarios)
+    
+    The always-linear classify_issue -> resolve_order -> prepare_action chain
+    runs in-process inside the fused nodes, so it costs one graph step.
+    
     Routing paths from ingest:
       - FULL: Both issue_type and order_details missing
       - RECLASSIFY: Only issue_type missing (or "unknown")
@@ -153,7 +169,7 @@ def create_graph() -> StateGraph:
     
     admin_review:
       - Pass-through checkpoint (review_status set by API)
-      - route_after_admin_review -> draft_reply
+      - Unconditional edge -> draft_reply
     
     draft_reply (second run, review_status=APPROVED/REJECTED):
       - Generates final message (approved action or rejection)
@@ -167,9 +183,8 @@ def create_graph() -> StateGraph:
     
     # Add nodes
     builder.add_node("ingest", ingest)
-    builder.add_node("classify_issue", classify_issue)
-    builder.add_node("resolve_order", resolve_order)
-    builder.add_node("prepare_action", prepare_action)
+    builder.add_node("classify_resolve_and_prepare", classify_resolve_and_prepare)
+    builder.add_node("resolve_and_prepare", resolve_and_prepare)
     builder.add_node("kb_orchestrator", kb_orchestrator)
     builder.add_node("policy_evaluator", policy_evaluator)
     builder.add_node("decision_maker", decision_maker)
@@ -185,23 +200,24 @@ def create_graph() -> StateGraph:
         "ingest",
         route_after_ingest,
         {
-            "classify_issue": "classify_issue",
-            "resolve_order": "resolve_order",
+            "classify_resolve_and_prepare": "classify_resolve_and_prepare",
+            "resolve_and_prepare": "resolve_and_prepare",
             "draft_reply": "draft_reply",
         }
     )
     
+    # Both fused nodes end with prepare_action -> decide whether to run RAG
+    for prepared_node in ("classify_resolve_and_prepare", "resolve_and_prepare"):
+        builder.add_conditional_edges(
+            prepared_node,
+            route_to_rag,
+            {
+                "kb_orchestrator": "kb_orchestrator",
+                "draft_reply": "draft_reply",
+            }
+        )
+    
     # Linear flow for nodes that always proceed to next
-    builder.add_edge("classify_issue", "resolve_order")
-    builder.add_edge("resolve_order", "prepare_action")
-    builder.add_conditional_edges(
-        "prepare_action",
-        route_to_rag,
-        {
-            "kb_orchestrator": "kb_orchestrator",
-            "draft_reply": "draft_reply",
-        }
-    )
     builder.add_edge("kb_orchestrator", "policy_evaluator")
     builder.add_edge("policy_evaluator", "decision_maker")
     builder.add_edge("decision_maker", "draft_reply")
@@ -218,6 +234,7 @@ def create_graph() -> StateGraph:
     )
     
     # After admin review -> always go to draft_reply for final message
+    # (APPROVED -> approved action message, REJECTED -> rejection message)
     builder.add_edge("admin_review", "draft_reply")
     
     # Final node leads to END
@@ -232,24 +249,49 @@ def compile_graph(checkpointer=None, interrupt_before=None):
     
     Args:
         checkpointer: Optional checkpointer for persistence (e.g., MemorySaver()).
-        interrupt_before: List of node names to interrupt before.
-                         Default: ["admin_review"] for HITL.
+        interrupt_before: Node names to interrupt before.
+                         Default: no interrupts; pass ["admin_review"] for HITL.
         
     Returns:
-        Compiled graph.
+        Compiled graph. Repeated calls with the same checkpointer and
+        interrupt nodes return the same cached instance.
     """
-    builder = create_graph()
-    
-    # Default interrupt before admin_review for HITL
+    # No interrupts unless requested (HITL callers pass ["admin_review"])
     if interrupt_before is None:
-        interrupt_before = []
+        interrupt_before = _EMPTY_INTERRUPT
+    
+    # "*" (interrupt before every node) must reach LangGraph as the bare string
+    if not isinstance(interrupt_before, str):
+        interrupt_before = tuple(interrupt_before)
+    return _compile_cached(checkpointer, interrupt_before)
+
+
+# The app compiles one or two configurations; the bound stops a process that
+# cycles through checkpointers from keeping every old one (and its graph) alive.
+@lru_cache(maxsize=8)
+def _compile_cached(checkpointer, interrupt_before: str | tuple[str, ...]):
+    """
+    Build and compile the graph once per (checkpointer, interrupt_before) pair.
     
-    return builder.compile(
+    Keyed on the checkpointer object itself rather than id() so a recycled
+    id can never hand back a graph bound to a dead checkpointer.
+    """
+    return create_graph().compile(
         checkpointer=checkpointer,
-        interrupt_before=interrupt_before,
+        interrupt_before=interrupt_before if isinstance(interrupt_before, str) else list(interrupt_before),
     )
 
 
-# Default graph instance (without checkpointer for basic testing)
-# For HITL workflows, use compile_graph() with MemorySaver() and interrupt_before=["admin_review"]
-graph = compile_graph()
+def __getattr__(name: str):
+    """
+    Lazily compile the default graph instance on first access (PEP 562).
+
+    The default graph has no checkpointer and is meant for basic testing.
+    For HITL workflows, use compile_graph() with a checkpointer and
+    interrupt_before=["admin_review"].
+    """
+    if name == "graph":
+        compiled = compile_graph()
+        globals()["graph"] = compiled
+        return compiled
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
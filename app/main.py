@@ -1,8 +1,11 @@
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Query
-import json, os, re
-from uuid import uuid4
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson, os, re
+from secrets import token_hex
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,7 +23,7 @@ from app.graph.workflow import compile_graph
 from app.rag.indexer import index_policies
 from app.case_history import upsert_case_row, list_case_history
 from app.schema import (
-    TriageInput, TriageOutput, AdminReviewInput,
+    TriageInput, TriageBatchInput, TriageBatchItem, TriageOutput, AdminReviewInput,
     ReviewStatus, DraftScenario, PendingTicket, PendingTicketsResponse
 )
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
@@ -48,17 +51,59 @@ async def lifespan(app: FastAPI):
         yield
 
 
-app = FastAPI(title="Ticket Triage API with LangGraph HITL", lifespan=lifespan)
+app = FastAPI(
+    title="Ticket Triage API with LangGraph HITL",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # -------------------------------------------------------------------
 # Pending Tickets Storage (In-Memory)
 # -------------------------------------------------------------------
-# Stores tickets awaiting admin approval for GET /admin/review
-pending_tickets: dict[str, dict] = {}
+# Stores tickets awaiting admin approval for GET /admin/review.
+# Bounded and expiring so threads that are never reviewed do not accumulate forever.
+pending_tickets: TTLCache = TTLCache(maxsize=10_000, ttl=86400)
+
+# Bumped on every add/remove; GET /admin/review reuses its serialized body
+# while (version, live ticket count) is unchanged.
+_pending_version = 0
+_pending_body_cache: tuple[tuple[int, int], bytes] | None = None
+
+# Persist graph checkpoints once per run (on END, error, or the admin_review
+# interrupt) instead of after every node. Each request is a single run, so the
+# per-node intermediate checkpoints were never resumed from.
+GRAPH_DURABILITY = "exit"
+
+# Skeleton for a new conversation; copied per request, never mutated.
+_INITIAL_STATE_TEMPLATE: dict = {
+    "ticket_text": None,
+    "order_id": None,
+    "email": None,
+    "messages": [],
+    "issue_type": None,
+    "order_details": None,
+    "candidate_orders": None,
+    "evidence": None,
+    "recommendation": None,
+    "draft_reply": None,
+    "draft_scenario": None,
+    "route_path": None,
+    "suggested_action": None,
+    "policy_citations": None,
+    "policy_evaluation": None,
+    "applied_policies": None,
+    "confidence_score": None,
+    "decision_action": None,
+    "decision_reasoning": None,
+    "review_status": None,
+    "admin_feedback": None,
+    "sender": None,
+}
 
 
 def add_pending_ticket(thread_id: str, result: dict):
     """Add ticket to pending list when REPLY scenario with PENDING status."""
+    global _pending_version
     order_details = result.get("order_details") or {}
     pending_tickets[thread_id] = {
         "thread_id": thread_id,
@@ -73,63 +118,203 @@ def add_pending_ticket(thread_id: str, result: dict):
         "draft_reply": result.get("draft_reply"),
         "created_at": datetime.now().isoformat()
     }
+    _pending_version += 1
 
 
 def remove_pending_ticket(thread_id: str):
     """Remove ticket from pending list after admin review."""
-    pending_tickets.pop(thread_id, None)
+    global _pending_version
+    if pending_tickets.pop(thread_id, None) is not None:
+        _pending_version += 1
+
+
+def _messages_to_dicts(messages) -> list[dict]:
+    """Convert graph messages to role/content dicts for the API response."""
+    converted = []
+    for msg in messages:
+        # One getattr per field instead of hasattr + attribute load
+        content = getattr(msg, "content", None)
+        converted.append({
+            "role": getattr(msg, "type", "unknown"),
+            "content": content if content is not None else str(msg),
+        })
+    return converted
+
+
+def _summarize_candidates(orders) -> list[dict] | None:
+    """Summarize candidate orders for the CONFIRM_ORDER picker, or None if absent."""
+    if not orders:
+        return None
+    return [
+        {"order_id": o.get("order_id"), "status": o.get("status"),
+         "first_item": o["items"][0]["name"] if o.get("items") else None}
+        for o in orders
+    ]
+
+
+def _build_triage_output(thread_id: str, result: dict) -> TriageOutput:
+    """Build the TriageOutput response from a graph run result."""
+    # Get draft_reply for both new field and backward compatibility
+    draft_reply = result.get("draft_reply")
+    return TriageOutput(
+        thread_id=thread_id,
+        order_id=result.get("order_id"),
+        email=result.get("email"),
+        issue_type=result.get("issue_type"),
+        draft_scenario=result.get("draft_scenario"),
+        draft_reply=draft_reply,
+        suggested_action=result.get("suggested_action"),
+        policy_evaluation=result.get("policy_evaluation"),
+        applied_policies=result.get("applied_policies"),
+        confidence_score=result.get("confidence_score"),
+        decision_action=result.get("decision_action"),
+        decision_reasoning=result.get("decision_reasoning"),
+        review_status=result.get("review_status"),
+        evidence=result.get("evidence"),
+        recommendation=result.get("recommendation"),
+        candidate_orders=_summarize_candidates(result.get("candidate_orders")),
+        messages=_messages_to_dicts(result.get("messages", [])),
+        # Backward compatibility fields
+        order=result.get("order_details"),  # Full order object
+        reply_text=draft_reply,  # Alias for draft_reply
+    )
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MOCK_DIR = os.path.join(ROOT, "mock_data")
+ORDER_ID_RE = re.compile(r"(ORD\d{4})", re.IGNORECASE)
 
 def load(name):
-    with open(os.path.join(MOCK_DIR, name), "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(os.path.join(MOCK_DIR, name), "rb") as f:
+        return orjson.loads(f.read())
 
 ORDERS = load("orders.json")
 ISSUES = load("issues.json")
 REPLIES = load("replies.json")
 
-# Load orders into the graph tools module
+# Load orders into the graph tools module; it also builds the by-id / by-email
+# lookup indexes the order endpoints below read (graph_tools.ORDERS_BY_*).
 graph_tools.load_orders(ORDERS)
 
+# Lowercased (order_id, customer_name) per order for free-text search; kept apart
+# from the order dicts so API responses never carry derived fields.
+ORDER_SEARCH_KEYS = [(_o, _o["order_id"].lower(), _o["customer_name"].lower()) for _o in ORDERS]
+
+# Single-pass keyword matcher: a zero-width lookahead alternation reports a keyword
+# at every text position, so the earliest matching rule is min() over the hits.
+ISSUE_RULE_INDEX: dict[str, int] = {}
+for _i, _rule in enumerate(ISSUES):
+    ISSUE_RULE_INDEX.setdefault(_rule["keyword"], _i)
+ISSUE_RE = re.compile("(?=(" + "|".join(re.escape(r["keyword"]) for r in ISSUES) + "))") if ISSUES else None
+
 @app.get("/health")
-def health(): return {"status": "ok"}
+async def health(): return {"status": "ok"}
 
 @app.get("/orders/get")
-def orders_get(order_id: str = Query(...)):
-    for o in ORDERS:
-        if o["order_id"] == order_id: return o
-    raise HTTPException(status_code=404, detail="Order not found")
+async def orders_get(order_id: str = Query(...)):
+    o = graph_tools.ORDERS_BY_ID.get(order_id)
+    if o is None: raise HTTPException(status_code=404, detail="Order not found")
+    return o
 
 @app.get("/orders/search")
-def orders_search(customer_email: str | None = None, q: str | None = None):
+async def orders_search(customer_email: str | None = None, q: str | None = None):
+    email_matches = graph_tools.ORDERS_BY_EMAIL.get(customer_email.lower(), []) if customer_email else []
+    if not q: return {"results": list(email_matches)}
+    email_ids = {o["order_id"] for o in email_matches}
+    q = q.lower()
     matches = []
-    for o in ORDERS:
-        if customer_email and o["email"].lower() == customer_email.lower():
-            matches.append(o)
-        elif q and (o["order_id"].lower() in q.lower() or o["customer_name"].lower() in q.lower()):
+    for o, oid_lower, name_lower in ORDER_SEARCH_KEYS:
+        if o["order_id"] in email_ids or oid_lower in q or name_lower in q:
             matches.append(o)
     return {"results": matches}
 
 @app.post("/classify/issue")
-def classify_issue(payload: dict):
+async def classify_issue(payload: dict):
     text = payload.get("ticket_text", "").lower()
-    for rule in ISSUES:
-        if rule["keyword"] in text:
-            return {"issue_type": rule["issue_type"], "confidence": 0.85}
+    hits = {m.group(1) for m in ISSUE_RE.finditer(text)} if ISSUE_RE else set()
+    if hits:
+        rule = ISSUES[min(ISSUE_RULE_INDEX[k] for k in hits)]
+        return {"issue_type": rule["issue_type"], "confidence": 0.85}
     return {"issue_type": "unknown", "confidence": 0.1}
 
+def _to_format_template(template: str) -> str:
+    """Convert a {{placeholder}} reply template to str.format syntax once."""
+    escaped = template.replace("{", "{{").replace("}", "}}")
+    for field in ("customer_name", "order_id"):
+        escaped = escaped.replace("{{{{%s}}}}" % field, "{%s}" % field)
+    return escaped
+
+DEFAULT_REPLY_TEMPLATE = _to_format_template("Hi {{customer_name}}, we are reviewing order {{order_id}}.")
+REPLIES_BY_ISSUE = {}
+for _r in REPLIES:
+    REPLIES_BY_ISSUE.setdefault(_r["issue_type"], _to_format_template(_r["template"]) if _r["template"] else None)
+
 def render_reply(issue_type: str, order):
-    template = next((r["template"] for r in REPLIES if r["issue_type"] == issue_type), None)
-    if not template: template = "Hi {{customer_name}}, we are reviewing order {{order_id}}."
-    return template.replace("{{customer_name}}", order.get("customer_name","Customer")).replace("{{order_id}}", order.get("order_id",""))
+    template = REPLIES_BY_ISSUE.get(issue_type) or DEFAULT_REPLY_TEMPLATE
+    return template.format(customer_name=order.get("customer_name","Customer"), order_id=order.get("order_id",""))
 
 @app.post("/reply/draft")
-def reply_draft(payload: dict):
+async def reply_draft(payload: dict):
     return {"reply_text": render_reply(payload.get("issue_type"), payload.get("order", {}))}
 
-@app.post("/triage/invoke", response_model=TriageOutput)
+
+async def _build_input_state(hitl_graph, body: TriageInput, config: dict) -> dict:
+    """Return the graph input for a new conversation or a follow-up on an existing thread."""
+    # Check if thread has existing state (follow-up message).
+    # Read the latest checkpoint directly: aget_state() also resolves tasks,
+    # interrupts and subgraph state, none of which is needed here.
+    checkpoint_tuple = await hitl_graph.checkpointer.aget_tuple(config)
+    existing_values = checkpoint_tuple.checkpoint.get("channel_values", {}) if checkpoint_tuple else {}
+    
+    # Check if state dict has content (values dict is not empty means state exists)
+    if existing_values.get("ticket_text"):
+        # FOLLOW-UP: Only pass new ticket_text
+        # The checkpointer restores existing context (order_id, order_details, etc.)
+        # The ingest node will determine the routing path based on context
+        input_state = {"ticket_text": body.ticket_text}
+    else:
+        # NEW CONVERSATION: Full initial state
+        input_state = _INITIAL_STATE_TEMPLATE.copy()
+        input_state["ticket_text"] = body.ticket_text
+        input_state["order_id"] = body.order_id
+        input_state["messages"] = []  # fresh list; never share the template's
+    return input_state
+
+
+def _record_triage_result(thread_id: str, result: dict):
+    """Queue the ticket for admin review if needed and upsert its case-history row."""
+    # Add to pending tickets if REPLY scenario with PENDING status
+    if (result.get("draft_scenario") == DraftScenario.REPLY and 
+        result.get("review_status") == ReviewStatus.PENDING):
+        add_pending_ticket(thread_id, result)
+
+    # Upsert case-history row for frontend audit/history panes.
+    upsert_case_row(result_state=result, thread_id=thread_id)
+
+
+async def _run_triage(hitl_graph, body: TriageInput, thread_id: str) -> TriageOutput:
+    """Run one triage turn until the admin_review interrupt or END and record the result."""
+    # Prepare graph config with thread_id for checkpointing
+    config = {"configurable": {"thread_id": thread_id}}
+    
+    input_state = await _build_input_state(hitl_graph, body, config)
+    
+    # Invoke the graph - it will run until interrupt or END
+    result = await hitl_graph.ainvoke(input_state, config, durability=GRAPH_DURABILITY)
+    
+    _record_triage_result(thread_id, result)
+    
+    return _build_triage_output(thread_id, result)
+
+
+def _stream_default(obj):
+    """orjson fallback for values in streamed node updates (messages, interrupts)."""
+    content = getattr(obj, "content", None)
+    if content is not None:
+        return {"role": getattr(obj, "type", "unknown"), "content": content}
+    return str(obj)
+
+
+@app.post("/triage/invoke", response_model=TriageOutput, response_class=ORJSONResponse)
 async def triage_invoke_langgraph(body: TriageInput):
     """
     Invoke the LangGraph ticket triage workflow with HITL support.
@@ -150,111 +335,87 @@ async def triage_invoke_langgraph(body: TriageInput):
     - NO_ORDERS_FOUND: No orders for email, asks to verify
     - CONFIRM_ORDER: Multiple orders found, asks user to pick
     """
-    # Generate or use existing thread_id
-    thread_id = body.thread_id or str(uuid4())
-    
-    # Prepare graph config with thread_id for checkpointing
-    config = {"configurable": {"thread_id": thread_id}}
-    
     try:
-        hitl_graph = app.state.hitl_graph
+        # Generate or use existing thread_id
+        return await _run_triage(app.state.hitl_graph, body, body.thread_id or token_hex(16))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing triage: {str(e)}")
 
-        # Check if thread has existing state (follow-up message)
-        existing_state = await hitl_graph.aget_state(config)
-        
-        # Check if state dict has content (values dict is not empty means state exists)
-        if existing_state.values and existing_state.values.get("ticket_text"):
-            # FOLLOW-UP: Only pass new ticket_text
-            # The checkpointer restores existing context (order_id, order_details, etc.)
-            # The ingest node will determine the routing path based on context
-            input_state = {"ticket_text": body.ticket_text}
+
+@app.post("/triage/batch", response_model=list[TriageBatchItem], response_class=ORJSONResponse)
+async def triage_batch(body: TriageBatchInput):
+    """
+    Triage several tickets in one request.
+    
+    Each ticket runs exactly as in POST /triage/invoke, concurrently on the
+    shared graph. The response has one entry per ticket, in request order,
+    carrying its thread_id and either the result or the error, so one failing
+    ticket never hides the others. Tickets must target distinct threads,
+    since two runs on one thread would race on its checkpoint.
+    """
+    thread_ids = [t.thread_id for t in body.tickets if t.thread_id]
+    if len(thread_ids) != len(set(thread_ids)):
+        raise HTTPException(status_code=400, detail="Each ticket in a batch must use a distinct thread_id")
+    
+    hitl_graph = app.state.hitl_graph
+    # Assign thread_ids up front so failed entries can still be referenced
+    batch_thread_ids = [t.thread_id or token_hex(16) for t in body.tickets]
+    results = await asyncio.gather(
+        *(_run_triage(hitl_graph, t, tid) for t, tid in zip(body.tickets, batch_thread_ids)),
+        return_exceptions=True,
+    )
+    
+    items = []
+    for index, (thread_id, result) in enumerate(zip(batch_thread_ids, results)):
+        if isinstance(result, Exception):
+            items.append(TriageBatchItem(index=index, thread_id=thread_id, error=f"Error processing triage: {str(result)}"))
         else:
-            # NEW CONVERSATION: Full initial state
-            input_state = {
-                "ticket_text": body.ticket_text,
-                "order_id": body.order_id,
-                "email": None,
-                "messages": [],
-                "issue_type": None,
-                "order_details": None,
-                "candidate_orders": None,
-                "evidence": None,
-                "recommendation": None,
-                "draft_reply": None,
-                "draft_scenario": None,
-                "route_path": None,
-                "suggested_action": None,
-                "policy_citations": None,
-                "policy_evaluation": None,
-                "applied_policies": None,
-                "confidence_score": None,
-                "decision_action": None,
-                "decision_reasoning": None,
-                "review_status": None,
-                "admin_feedback": None,
-                "sender": None,
-            }
-        
-        # Invoke the graph - it will run until interrupt or END
-        result = await hitl_graph.ainvoke(input_state, config)
-        
-        # Extract messages (convert to dict format for API response)
-        messages = []
-        for msg in result.get("messages", []):
-            messages.append({
-                "role": msg.type if hasattr(msg, "type") else "unknown",
-                "content": msg.content if hasattr(msg, "content") else str(msg)
-            })
-        
-        # Extract candidate orders summary if present
-        candidate_orders = None
-        if result.get("candidate_orders"):
-            candidate_orders = [
-                {"order_id": o.get("order_id"), "status": o.get("status"), 
-                 "first_item": o["items"][0]["name"] if o.get("items") else None}
-                for o in result.get("candidate_orders", [])
-            ]
-        
-        # Get draft_reply for both new field and backward compatibility
-        draft_reply = result.get("draft_reply")
-        
-        # Add to pending tickets if REPLY scenario with PENDING status
-        if (result.get("draft_scenario") == DraftScenario.REPLY and 
-            result.get("review_status") == ReviewStatus.PENDING):
-            add_pending_ticket(thread_id, result)
+            items.append(TriageBatchItem(index=index, thread_id=thread_id, result=result))
+    return items
 
-        # Upsert case-history row for frontend audit/history panes.
-        upsert_case_row(result_state=result, thread_id=thread_id)
-        
-        return TriageOutput(
-            thread_id=thread_id,
-            order_id=result.get("order_id"),
-            email=result.get("email"),
-            issue_type=result.get("issue_type"),
-            draft_scenario=result.get("draft_scenario"),
-            draft_reply=draft_reply,
-            suggested_action=result.get("suggested_action"),
-            policy_evaluation=result.get("policy_evaluation"),
-            applied_policies=result.get("applied_policies"),
-            confidence_score=result.get("confidence_score"),
-            decision_action=result.get("decision_action"),
-            decision_reasoning=result.get("decision_reasoning"),
-            review_status=result.get("review_status"),
-            evidence=result.get("evidence"),
-            recommendation=result.get("recommendation"),
-            candidate_orders=candidate_orders,
-            messages=messages,
-            # Backward compatibility fields
-            order=result.get("order_details"),  # Full order object
-            reply_text=draft_reply,  # Alias for draft_reply
-        )
-        
+
+@app.post("/triage/stream")
+async def triage_stream(body: TriageInput):
+    """
+    Streaming variant of POST /triage/invoke.
+    
+    Emits newline-delimited JSON as the graph runs:
+    - {"event": "update", "thread_id", "data": {node: state_update}} after each node
+    - {"event": "result", "data": TriageOutput} once the run reaches the interrupt or END
+    - {"event": "error", "detail": ...} if the run fails part-way
+    
+    Pending-ticket and case-history bookkeeping match /triage/invoke.
+    """
+    thread_id = body.thread_id or token_hex(16)
+    config = {"configurable": {"thread_id": thread_id}}
+    hitl_graph = app.state.hitl_graph
+    try:
+        input_state = await _build_input_state(hitl_graph, body, config)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing triage: {str(e)}")
 
-
-@app.get("/admin/review", response_model=PendingTicketsResponse)
-def list_pending_reviews():
+    async def _events():
+        try:
+            async for update in hitl_graph.astream(
+                input_state, config, stream_mode="updates", durability=GRAPH_DURABILITY
+            ):
+                yield orjson.dumps(
+                    {"event": "update", "thread_id": thread_id, "data": update},
+                    default=_stream_default,
+                ) + b"\n"
+            # Full state (reducers applied) as persisted at the end of the run
+            result = (await hitl_graph.aget_state(config)).values
+            _record_triage_result(thread_id, result)
+            output = _build_triage_output(thread_id, result)
+            yield orjson.dumps({"event": "result", "data": output.model_dump(mode="json")}) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"event": "error", "detail": f"Error processing triage: {str(e)}"}) + b"\n"
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
+@app.get("/admin/review", response_model=PendingTicketsResponse, response_class=ORJSONResponse)
+async def list_pending_reviews():
     """
     List all tickets awaiting admin approval.
     
@@ -264,14 +425,21 @@ def list_pending_reviews():
     - suggested_action: What admin is approving
     - draft_reply: Current "ticket raised" message sent to user
     """
-    tickets = [PendingTicket(**t) for t in pending_tickets.values()]
-    return PendingTicketsResponse(
-        pending_count=len(tickets),
-        tickets=tickets
-    )
+    global _pending_body_cache
+    # Drop expired tickets first; expiry shrinks the count, which invalidates the cache
+    pending_tickets.expire()
+    key = (_pending_version, len(pending_tickets))
+    if _pending_body_cache is None or _pending_body_cache[0] != key:
+        tickets = [PendingTicket(**t) for t in pending_tickets.values()]
+        response = PendingTicketsResponse(
+            pending_count=len(tickets),
+            tickets=tickets
+        )
+        _pending_body_cache = (key, orjson.dumps(response.model_dump(mode="json")))
+    return Response(content=_pending_body_cache[1], media_type="application/json")
 
 
-@app.post("/admin/review", response_model=TriageOutput)
+@app.post("/admin/review", response_model=TriageOutput, response_class=ORJSONResponse)
 async def admin_review_endpoint(thread_id: str, body: AdminReviewInput):
     """
     Resume the triage workflow after admin review.
@@ -301,57 +469,16 @@ async def admin_review_endpoint(thread_id: str, body: AdminReviewInput):
         )
         
         # Resume the graph with None input to continue from checkpoint
-        result = await hitl_graph.ainvoke(None, config)
+        result = await hitl_graph.ainvoke(None, config, durability=GRAPH_DURABILITY)
         
         # Remove from pending after review
         if body.action.status in (ReviewStatus.APPROVED, ReviewStatus.REJECTED):
             remove_pending_ticket(thread_id)
         
-        # Extract messages
-        messages = []
-        for msg in result.get("messages", []):
-            messages.append({
-                "role": msg.type if hasattr(msg, "type") else "unknown",
-                "content": msg.content if hasattr(msg, "content") else str(msg)
-            })
-        
-        # Extract candidate orders summary if present
-        candidate_orders = None
-        if result.get("candidate_orders"):
-            candidate_orders = [
-                {"order_id": o.get("order_id"), "status": o.get("status"), 
-                 "first_item": o["items"][0]["name"] if o.get("items") else None}
-                for o in result.get("candidate_orders", [])
-            ]
-        
-        # Get draft_reply for both new field and backward compatibility
-        draft_reply = result.get("draft_reply")
-
         # Upsert case-history row with post-review state.
         upsert_case_row(result_state=result, thread_id=thread_id)
         
-        return TriageOutput(
-            thread_id=thread_id,
-            order_id=result.get("order_id"),
-            email=result.get("email"),
-            issue_type=result.get("issue_type"),
-            draft_scenario=result.get("draft_scenario"),
-            draft_reply=draft_reply,
-            suggested_action=result.get("suggested_action"),
-            policy_evaluation=result.get("policy_evaluation"),
-            applied_policies=result.get("applied_policies"),
-            confidence_score=result.get("confidence_score"),
-            decision_action=result.get("decision_action"),
-            decision_reasoning=result.get("decision_reasoning"),
-            review_status=result.get("review_status"),
-            evidence=result.get("evidence"),
-            recommendation=result.get("recommendation"),
-            candidate_orders=candidate_orders,
-            messages=messages,
-            # Backward compatibility fields
-            order=result.get("order_details"),  # Full order object
-            reply_text=draft_reply,  # Alias for draft_reply
-        )
+        return _build_triage_output(thread_id, result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing admin review: {str(e)}")
@@ -395,16 +522,16 @@ def get_cases_history(
 
 # Legacy endpoints (keep for backward compatibility)
 @app.post("/triage/invoke_legacy")
-def triage_invoke_legacy(body: TriageInput):
+async def triage_invoke_legacy(body: TriageInput):
     """Legacy procedural implementation for backward compatibility."""
     text = body.ticket_text
     order_id = body.order_id
     if not order_id:
-        m = re.search(r"(ORD\d{4})", text, re.IGNORECASE)
+        m = ORDER_ID_RE.search(text)
         if m: order_id = m.group(1).upper()
     if not order_id: raise HTTPException(status_code=400, detail="order_id missing and not found in text")
-    order = next((o for o in ORDERS if o["order_id"] == order_id), None)
+    order = graph_tools.ORDERS_BY_ID.get(order_id)
     if not order: raise HTTPException(status_code=404, detail="order not found")
-    issue = classify_issue({"ticket_text": text})
-    reply = reply_draft({"ticket_text": text, "order": order, "issue_type": issue["issue_type"]})
+    issue = await classify_issue({"ticket_text": text})
+    reply = await reply_draft({"ticket_text": text, "order": order, "issue_type": issue["issue_type"]})
     return {"order_id": order_id, "issue_type": issue["issue_type"], "order": order, "reply_text": reply["reply_text"]}
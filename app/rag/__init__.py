@@ -6,6 +6,7 @@ from app.rag.indexer import (
     get_collection,
     index_policies,
     list_indexed_policies,
+    read_index_version,
     upsert_policy_document,
 )
 from app.rag.retriever import query_policies
@@ -15,5 +16,6 @@ __all__ = [
     "index_policies",
     "list_indexed_policies",
     "query_policies",
+    "read_index_version",
     "upsert_policy_document",
 ]
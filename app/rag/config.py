@@ -7,23 +7,32 @@ import os
 COLLECTION_NAME = "viridien_policies"
 EMBEDDING_MODEL = "text-embedding-3-small"
 TOP_K = 3
-FRAUD_THRESHOLD = 80.0
+# kb_orchestrator retrieves TOP_K * RERANK_POOL_FACTOR candidates and reranks them down to TOP_K.
+RERANK_POOL_FACTOR = 3
+FRAUD_THRESHOLD = float(os.getenv("FRAUD_THRESHOLD", "80.0"))
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 POLICIES_DIR = os.path.join(ROOT, "policies")
 CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", os.path.join(ROOT, ".chroma"))
+# Rewritten whenever indexing changes the collection, so caches can key on it cheaply.
+INDEX_VERSION_FILE = os.path.join(CHROMA_PERSIST_DIR, "index_version")
+
+# Reranker backend: "llm" (gpt-4o-mini listwise ranking) or "cross_encoder" (local ONNX).
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "llm").strip().lower()
+CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "BAAI/bge-reranker-v2-m3")
+CROSS_ENCODER_ONNX_PATH = os.getenv("CROSS_ENCODER_ONNX_PATH", "")
 
 # Primary policy mappings by file.
-POLICY_ISSUE_MAP: dict[str, list[str]] = {
-    "chargeback_policy.md": ["duplicate_charge"],
-    "delivery_policy.md": ["late_delivery"],
-    "refund_policy.md": ["refund_request"],
-    "warranty_policy.md": ["defective_product", "damaged_item"],
+POLICY_ISSUE_MAP: dict[str, tuple[str, ...]] = {
+    "chargeback_policy.md": ("duplicate_charge",),
+    "delivery_policy.md": ("late_delivery",),
+    "refund_policy.md": ("refund_request",),
+    "warranty_policy.md": ("defective_product", "damaged_item"),
     # Fraud policy is intentionally conditional (amount threshold), not primary-mapped.
-    "fraud_policy.md": [],
+    "fraud_policy.md": (),
 }
 
-KNOWN_ISSUE_TYPES = {
+KNOWN_ISSUE_TYPES: frozenset[str] = frozenset({
     "refund_request",
     "duplicate_charge",
     "late_delivery",
@@ -31,6 +40,6 @@ KNOWN_ISSUE_TYPES = {
     "damaged_item",
     "wrong_item",
     "missing_item",
-}
+})
 
-FRAUD_ELIGIBLE_ISSUES = {"refund_request", "wrong_item", "missing_item"}
+FRAUD_ELIGIBLE_ISSUES: frozenset[str] = frozenset({"refund_request", "wrong_item", "missing_item"})
@@ -4,7 +4,11 @@ Policy document indexing utilities for ChromaDB.
 
 from __future__ import annotations
 
+import hashlib
 import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 
 import chromadb
@@ -14,25 +18,73 @@ from app.rag.config import (
     CHROMA_PERSIST_DIR,
     COLLECTION_NAME,
     EMBEDDING_MODEL,
+    INDEX_VERSION_FILE,
     POLICIES_DIR,
     POLICY_ISSUE_MAP,
 )
 
+# Embedding requests are split into sub-batches of this size and sent concurrently.
+_EMBED_BATCH_SIZE = 96
+_EMBED_MAX_CONCURRENCY = 8
+
 _client: chromadb.ClientAPI | None = None
 _collection: Any | None = None
 _embedding_function: OpenAIEmbeddingFunction | None = None
-
-
+# "issue_<type>" metadata keys, built once per issue type.
+_ISSUE_KEY_CACHE: dict[str, str] = {}
+
+
+class BatchedOpenAIEmbeddingFunction(OpenAIEmbeddingFunction):
+    """OpenAIEmbeddingFunction that embeds large inputs as concurrent sub-batches."""
+
+    def __call__(self, input):
+        texts = list(input)
+        if len(texts) <= _EMBED_BATCH_SIZE:
+            return super().__call__(texts)
+
+        # Length-sorted batches keep each request token-homogeneous; results are
+        # written back by original index so output order matches input order.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[i:i + _EMBED_BATCH_SIZE] for i in range(0, len(order), _EMBED_BATCH_SIZE)]
+        embed_batch = super().__call__
+        embeddings: list[Any] = [None] * len(texts)
+        # Threads rather than asyncio.run(): this is called from inside the running
+        # server event loop during startup indexing.
+        with ThreadPoolExecutor(max_workers=min(_EMBED_MAX_CONCURRENCY, len(batches))) as executor:
+            results = executor.map(lambda batch: embed_batch([texts[i] for i in batch]), batches)
+            for batch, vectors in zip(batches, results):
+                for index, vector in zip(batch, vectors):
+                    embeddings[index] = vector
+        return embeddings
+
+
+@lru_cache(maxsize=256)
 def _title_from_filename(filename: str) -> str:
     base = filename.replace(".md", "").replace("_", " ")
     return " ".join(word.capitalize() for word in base.split())
 
 
-def _build_issue_metadata(issue_types: list[str]) -> dict[str, Any]:
-    metadata: dict[str, Any] = {"issue_types": ",".join(issue_types)}
-    for issue in issue_types:
-        metadata[f"issue_{issue}"] = True
-    return metadata
+def _issue_key(issue: str) -> str:
+    key = _ISSUE_KEY_CACHE.get(issue)
+    if key is None:
+        key = _ISSUE_KEY_CACHE[issue] = f"issue_{issue}"
+    return key
+
+
+def _build_issue_metadata(issue_types: tuple[str, ...]) -> dict[str, Any]:
+    return {
+        "issue_types": ",".join(issue_types),
+        **{_issue_key(issue): True for issue in issue_types},
+    }
+
+
+def _policy_metadata(filename: str, content: str) -> dict[str, Any]:
+    return {
+        "source": filename,
+        "title": _title_from_filename(filename),
+        "content_hash": hashlib.sha1(content.encode("utf-8")).hexdigest(),
+        **_build_issue_metadata(POLICY_ISSUE_MAP.get(filename, ())),
+    }
 
 
 def get_chroma_client() -> chromadb.ClientAPI:
@@ -49,7 +101,7 @@ def get_embedding_function() -> OpenAIEmbeddingFunction:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is required for policy embeddings.")
-        _embedding_function = OpenAIEmbeddingFunction(
+        _embedding_function = BatchedOpenAIEmbeddingFunction(
             api_key=api_key,
             model_name=EMBEDDING_MODEL,
         )
@@ -67,52 +119,81 @@ def get_collection() -> Any:
     return _collection
 
 
+def _bump_index_version() -> None:
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    tmp = f"{INDEX_VERSION_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(secrets.token_hex(8))
+    os.replace(tmp, INDEX_VERSION_FILE)
+
+
+def read_index_version() -> str:
+    """Token that changes whenever the indexed policies change ("" if never written)."""
+    try:
+        with open(INDEX_VERSION_FILE, encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def _load_policy_document(filepath: str, filename: str) -> dict[str, Any] | None:
+    # Binary read + one decode skips the text-layer wrapper for these small files.
+    with open(filepath, "rb") as f:
+        content = f.read().decode("utf-8").strip()
+    if not content:
+        return None
+
+    return {
+        "id": f"policy::{filename}",
+        "document": content,
+        "metadata": _policy_metadata(filename, content),
+        "source": filename,
+    }
+
+
 def load_policy_documents(policies_dir: str | None = None) -> list[dict[str, Any]]:
     docs_dir = policies_dir or POLICIES_DIR
     if not os.path.isdir(docs_dir):
         return []
 
-    documents: list[dict[str, Any]] = []
-    for filename in sorted(os.listdir(docs_dir)):
-        if not filename.endswith(".md"):
-            continue
-        filepath = os.path.join(docs_dir, filename)
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-        if not content:
-            continue
-
-        issue_types = POLICY_ISSUE_MAP.get(filename, [])
-        metadata = {
-            "source": filename,
-            "title": _title_from_filename(filename),
-            **_build_issue_metadata(issue_types),
-        }
-        documents.append(
-            {
-                "id": f"policy::{filename}",
-                "document": content,
-                "metadata": metadata,
-                "source": filename,
-            }
+    # scandir yields DirEntry objects with cached type info, so filtering needs no extra stat.
+    with os.scandir(docs_dir) as it:
+        entries = sorted(
+            (entry for entry in it if entry.name.endswith(".md") and entry.is_file()),
+            key=lambda entry: entry.name,
         )
-    return documents
+    if not entries:
+        return []
+
+    # File reads are I/O-bound; map() keeps results in sorted filename order.
+    with ThreadPoolExecutor(max_workers=min(32, len(entries))) as executor:
+        loaded = executor.map(lambda entry: _load_policy_document(entry.path, entry.name), entries)
+        return [doc for doc in loaded if doc is not None]
 
 
 def index_policies(policies_dir: str | None = None) -> int:
     docs = load_policy_documents(policies_dir=policies_dir)
     collection = get_collection()
 
-    existing_ids = collection.get().get("ids", [])
-    if existing_ids:
-        collection.delete(ids=existing_ids)
-
-    if docs:
-        collection.add(
-            ids=[doc["id"] for doc in docs],
-            documents=[doc["document"] for doc in docs],
-            metadatas=[doc["metadata"] for doc in docs],
+    # Diff against the persisted collection: metadata carries a content hash, so
+    # only new or changed policies are re-embedded and removed files are deleted.
+    existing = collection.get(include=["metadatas"])
+    stored = dict(zip(existing.get("ids", []), existing.get("metadatas") or []))
+    doc_ids = {doc["id"] for doc in docs}
+
+    stale_ids = [doc_id for doc_id in stored if doc_id not in doc_ids]
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+
+    changed = [doc for doc in docs if stored.get(doc["id"]) != doc["metadata"]]
+    if changed:
+        collection.upsert(
+            ids=[doc["id"] for doc in changed],
+            documents=[doc["document"] for doc in changed],
+            metadatas=[doc["metadata"] for doc in changed],
         )
+    if stale_ids or changed:
+        _bump_index_version()
     return len(docs)
 
 
@@ -126,16 +207,16 @@ def upsert_policy_document(file_path: str) -> str:
     if not content:
         raise ValueError(f"Policy file is empty: {file_path}")
 
-    issue_types = POLICY_ISSUE_MAP.get(filename, [])
-    metadata = {
-        "source": filename,
-        "title": _title_from_filename(filename),
-        **_build_issue_metadata(issue_types),
-    }
+    metadata = _policy_metadata(filename, content)
     doc_id = f"policy::{filename}"
 
     collection = get_collection()
+    # Same content hash and mapping already stored -> nothing to re-embed.
+    stored = collection.get(ids=[doc_id], include=["metadatas"]).get("metadatas") or []
+    if stored and stored[0] == metadata:
+        return doc_id
     collection.upsert(ids=[doc_id], documents=[content], metadatas=[metadata])
+    _bump_index_version()
     return doc_id
 
 
@@ -4,15 +4,14 @@ LangGraph nodes that implement Agentic RAG for policy checks.
 
 from __future__ import annotations
 
-import json
-import re
 from typing import Any
 
+import orjson
 from langchain_openai import ChatOpenAI
 
 from app.graph.state import GraphState
-from app.rag.config import KNOWN_ISSUE_TYPES, TOP_K
-from app.rag.retriever import query_policies, rerank_with_llm
+from app.rag.config import RERANK_POOL_FACTOR, TOP_K
+from app.rag.retriever import query_policies, rerank_policies
 from app.schema import DraftScenario
 
 _llm: ChatOpenAI | None = None
@@ -21,7 +20,13 @@ _llm: ChatOpenAI | None = None
 def _get_llm() -> ChatOpenAI:
     global _llm
     if _llm is None:
-        _llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        # JSON mode: the evaluator prompt asks for a JSON object, and the API
+        # guarantees the reply parses, so no regex extraction is needed.
+        _llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            model_kwargs={"response_format": {"type": "json_object"}},
+        )
     return _llm
 
 
@@ -36,21 +41,6 @@ def _extract_first_rule_line(content: str) -> str:
     return content.strip()[:160]
 
 
-def _safe_json_object(text: str) -> dict[str, Any]:
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if not match:
-        return {}
-    try:
-        return json.loads(match.group(0))
-    except json.JSONDecodeError:
-        return {}
-
-
 def kb_orchestrator(state: GraphState) -> dict[str, Any]:
     """
     Plan retrieval strategy and fetch policy citations for the current action.
@@ -66,21 +56,21 @@ def kb_orchestrator(state: GraphState) -> dict[str, Any]:
 
     query_text = f"Issue type: {issue_type}\nTicket: {ticket_text}\nProposed action: {suggested_action}"
     try:
-        citations = query_policies(
+        # Over-fetch so the reranker has more than TOP_K candidates to choose from;
+        # rerank_policies trims back to TOP_K (and skips the model when it has no choice).
+        candidates = query_policies(
             issue_type=issue_type,
             query_text=query_text,
             order_details=order_details,
-            top_k=TOP_K,
+            top_k=TOP_K * RERANK_POOL_FACTOR,
+        )
+        context = f"issue_type={issue_type}; amount={order_details.get('total_amount', 'N/A')}"
+        citations = rerank_policies(
+            query=query_text,
+            results=candidates,
+            issue_context=context,
+            top_n=TOP_K,
         )
-
-        if len(citations) > TOP_K:
-            context = f"issue_type={issue_type}; amount={order_details.get('total_amount', 'N/A')}"
-            citations = rerank_with_llm(
-                query=query_text,
-                results=citations,
-                issue_context=context,
-                top_n=TOP_K,
-            )
     except Exception:
         citations = []
 
@@ -116,14 +106,11 @@ def policy_evaluator(state: GraphState) -> dict[str, Any]:
             }
         )
 
+    # Static instructions first, per-ticket inputs last, so the shared prefix
+    # can be served from the provider's prompt cache.
     prompt = f"""
 You are a policy compliance checker for customer support decisions.
 
-Issue type: {issue_type}
-Order summary JSON: {json.dumps(order_details, ensure_ascii=True)}
-Proposed action: {suggested_action}
-Retrieved policy snippets JSON: {json.dumps(payload, ensure_ascii=True)}
-
 Return STRICT JSON only:
 {{
   "policy_evaluation": "short paragraph that states if action is compliant and why",
@@ -136,10 +123,15 @@ Return STRICT JSON only:
     }}
   ]
 }}
+
+Issue type: {issue_type}
+Order summary JSON: {orjson.dumps(order_details).decode()}
+Proposed action: {suggested_action}
+Retrieved policy snippets JSON: {orjson.dumps(payload).decode()}
 """
 
     try:
-        parsed = _safe_json_object(_get_llm().invoke(prompt).content.strip())
+        parsed = orjson.loads(_get_llm().invoke(prompt).content)
     except Exception:
         parsed = {}
     applied_policies = parsed.get("applied_policies", [])
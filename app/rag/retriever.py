@@ -4,13 +4,74 @@ Retriever and reranker utilities for policy RAG.
 
 from __future__ import annotations
 
-import json
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 
+from cachetools import TTLCache
 from langchain_openai import ChatOpenAI
 
-from app.rag.config import FRAUD_ELIGIBLE_ISSUES, FRAUD_THRESHOLD, TOP_K
-from app.rag.indexer import get_collection
+from app.rag.config import (
+    CROSS_ENCODER_MODEL,
+    CROSS_ENCODER_ONNX_PATH,
+    FRAUD_ELIGIBLE_ISSUES,
+    FRAUD_THRESHOLD,
+    RERANKER_BACKEND,
+    TOP_K,
+)
+from app.rag.indexer import get_collection, get_embedding_function
+
+# Pool for the independent Chroma lookups in query_policies, created on first use
+# and shared across calls. Sized for several concurrent requests (three lookups
+# each) so callers don't queue behind one another.
+_QUERY_MAX_WORKERS = 24
+_query_executor: ThreadPoolExecutor | None = None
+_query_executor_lock = threading.Lock()
+
+
+def _get_query_executor() -> ThreadPoolExecutor:
+    global _query_executor
+    if _query_executor is None:
+        with _query_executor_lock:
+            if _query_executor is None:
+                _query_executor = ThreadPoolExecutor(
+                    max_workers=_QUERY_MAX_WORKERS, thread_name_prefix="policy-query"
+                )
+    return _query_executor
+
+
+# Recent query_policies results keyed on (issue_type, sha1(query_text), include_fraud, top_k).
+# Short TTL bounds staleness after policies are re-indexed; TTLCache is not thread-safe.
+_query_cache: TTLCache = TTLCache(maxsize=2048, ttl=300)
+_query_cache_lock = threading.Lock()
+
+# LLM rerank outcomes (ranked source names) keyed on query/context hash + candidate sources.
+_rerank_cache: TTLCache = TTLCache(maxsize=2048, ttl=900)
+_rerank_cache_lock = threading.Lock()
+
+# (tokenizer, onnxruntime session) for the optional cross-encoder reranker, loaded once.
+_cross_encoder: tuple[Any, Any] | None = None
+_cross_encoder_lock = threading.Lock()
+
+_rerank_llm: ChatOpenAI | None = None
+
+_POINTWISE_RERANK_INSTRUCTIONS = """You are scoring one policy snippet for customer-support action validation.
+Rate how relevant the document is to the issue and query on a scale of 0 (irrelevant) to 10 (directly governs the action).
+Reply with the integer score only.
+"""
+_RERANK_MAX_CONCURRENCY = 8
+_DEFAULT_RERANK_SCORE = 5
+_SCORE_RE = re.compile(r"\d+")
+
+
+def _get_rerank_llm() -> ChatOpenAI:
+    global _rerank_llm
+    if _rerank_llm is None:
+        _rerank_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    return _rerank_llm
 
 
 def _score_from_distance(distance: float | None) -> float:
@@ -59,57 +120,95 @@ def _needs_fraud_policy(issue_type: str | None, order_details: dict[str, Any] |
         return False
 
 
+@lru_cache(maxsize=256)
+def _embed_query(query_text: str) -> Any:
+    # Cached so repeated ticket text across turns is embedded only once.
+    return get_embedding_function()([query_text])[0]
+
+
 def query_policies(
     issue_type: str | None,
     query_text: str,
     order_details: dict[str, Any] | None = None,
     top_k: int = TOP_K,
 ) -> list[dict[str, Any]]:
-    collection = get_collection()
-    results: list[dict[str, Any]] = []
     include_fraud = _needs_fraud_policy(issue_type, order_details)
+    cache_key = (issue_type, hashlib.sha1(query_text.encode("utf-8")).hexdigest(), include_fraud, top_k)
+    with _query_cache_lock:
+        cached = _query_cache.get(cache_key)
+    if cached is not None:
+        return [dict(item) for item in cached]
+
+    collection = get_collection()
+    # Embed once and share the vector; query_texts= would re-embed per query.
+    query_embedding = _embed_query(query_text)
 
-    if issue_type:
+    def _filtered() -> list[dict[str, Any]]:
+        if not issue_type:
+            return []
         issue_where = {f"issue_{issue_type}": True}
         filtered = collection.query(
-            query_texts=[query_text],
+            query_embeddings=[query_embedding],
             where=issue_where,
             n_results=top_k,
             include=["documents", "metadatas", "distances"],
         )
-        results.extend(_normalize_query_result(filtered))
+        return _normalize_query_result(filtered)
 
-    # Semantic fallback across all policies helps capture cross-cutting rules.
-    semantic = collection.query(
-        query_texts=[query_text],
-        n_results=max(top_k, 5),
-        include=["documents", "metadatas", "distances"],
-    )
-    results.extend(_normalize_query_result(semantic))
+    def _semantic() -> list[dict[str, Any]]:
+        # Semantic fallback across all policies helps capture cross-cutting rules.
+        semantic = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=max(top_k, 5),
+            include=["documents", "metadatas", "distances"],
+        )
+        return _normalize_query_result(semantic)
 
-    if include_fraud:
+    def _fraud() -> list[dict[str, Any]]:
+        if not include_fraud:
+            return []
         fraud = collection.get(
             where={"source": "fraud_policy.md"},
             include=["documents", "metadatas"],
         )
         docs = fraud.get("documents", []) or []
         metas = fraud.get("metadatas", []) or []
-        if docs:
-            results.append(
-                {
-                    "content": docs[0],
-                    "source": (metas[0] or {}).get("source", "fraud_policy.md"),
-                    "title": (metas[0] or {}).get("title", "Fraud Policy"),
-                    "relevance_score": 1.0,
-                    "metadata": metas[0] or {},
-                }
-            )
+        if not docs:
+            return []
+        return [
+            {
+                "content": docs[0],
+                "source": (metas[0] or {}).get("source", "fraud_policy.md"),
+                "title": (metas[0] or {}).get("title", "Fraud Policy"),
+                "relevance_score": 1.0,
+                "metadata": metas[0] or {},
+            }
+        ]
+
+    # The three lookups are independent round-trips; run them concurrently and
+    # merge in the original filtered -> semantic -> fraud order.
+    executor = _get_query_executor()
+    futures = [executor.submit(fn) for fn in (_filtered, _semantic, _fraud)]
+    results: list[dict[str, Any]] = []
+    for future in futures:
+        results.extend(future.result())
 
     deduped = _dedupe_by_source(results)
     if not include_fraud:
         deduped = [item for item in deduped if item.get("source") != "fraud_policy.md"]
     deduped.sort(key=lambda item: item.get("relevance_score", 0.0), reverse=True)
-    return deduped[: max(top_k, 3)]
+    ranked = deduped[: max(top_k, 3)]
+    # Results become graph-state citations; keep the cached dicts private.
+    with _query_cache_lock:
+        _query_cache[cache_key] = [dict(item) for item in ranked]
+    return ranked
+
+
+def _parse_rerank_score(text: str) -> int | None:
+    match = _SCORE_RE.search(text or "")
+    if not match:
+        return None
+    return min(int(match.group(0)), 10)
 
 
 def rerank_with_llm(
@@ -118,53 +217,120 @@ def rerank_with_llm(
     issue_context: str,
     top_n: int = TOP_K,
 ) -> list[dict[str, Any]]:
-    if not results:
-        return []
+    if len(results) <= top_n:
+        # Nothing would be dropped, so ordering by retrieval score is enough.
+        return list(results)
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    candidates = []
-    for idx, item in enumerate(results):
-        content = item.get("content", "")
-        candidates.append(
-            {
-                "index": idx,
-                "source": item.get("source"),
-                "content": content[:500],
-            }
-        )
+    by_source = {item.get("source"): item for item in results}
+    # Key on the candidate *set* so a different retrieval order still hits.
+    cache_key = (
+        hashlib.sha1(f"{query}\x00{issue_context}".encode("utf-8")).hexdigest(),
+        tuple(sorted(str(source) for source in by_source)),
+        top_n,
+    )
+    with _rerank_cache_lock:
+        cached_sources = _rerank_cache.get(cache_key)
+    if cached_sources is not None and len(by_source) == len(results):
+        return [by_source[source] for source in cached_sources]
 
-    prompt = f"""
-You are ranking policy snippets for customer-support action validation.
+    # One short scoring prompt per candidate: static instructions, then the
+    # document, then the per-request query, so prefixes are shared across calls.
+    prompts = [
+        f"""{_POINTWISE_RERANK_INSTRUCTIONS}
+Document ({item.get("source")}):
+{item.get("content", "")[:500]}
 
 Issue context: {issue_context}
 Query: {query}
 
-Candidates (JSON):
-{json.dumps(candidates, ensure_ascii=True)}
+Score 0-10:"""
+        for item in results
+    ]
+    responses = _get_rerank_llm().batch(
+        prompts,
+        config={"max_concurrency": _RERANK_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
 
-Return JSON with this schema only:
-{{
-  "ranked_indexes": [int, int, ...]
-}}
+    scores: list[int] = []
+    all_scored = True
+    for response in responses:
+        score = None if isinstance(response, Exception) else _parse_rerank_score(response.content)
+        if score is None:
+            # A failed or unparseable call keeps the candidate at a neutral score.
+            score = _DEFAULT_RERANK_SCORE
+            all_scored = False
+        scores.append(score)
 
-Rules:
-- Put most relevant first.
-- Include at most {top_n} indexes.
-- Only include indexes that exist.
-"""
-    raw = llm.invoke(prompt).content.strip()
-    try:
-        parsed = json.loads(raw)
-        ranked = parsed.get("ranked_indexes", [])
-    except json.JSONDecodeError:
-        return results[:top_n]
-
-    reindexed: list[dict[str, Any]] = []
-    used = set()
-    for idx in ranked:
-        if isinstance(idx, int) and 0 <= idx < len(results) and idx not in used:
-            reindexed.append(results[idx])
-            used.add(idx)
-    if not reindexed:
-        return results[:top_n]
-    return reindexed[:top_n]
+    # Stable sort: equal scores keep retrieval (relevance) order.
+    order = sorted(range(len(results)), key=lambda idx: scores[idx], reverse=True)
+    ranked = [results[idx] for idx in order[:top_n]]
+    if all_scored:
+        with _rerank_cache_lock:
+            _rerank_cache[cache_key] = tuple(item.get("source") for item in ranked)
+    return ranked
+
+
+def _get_cross_encoder() -> tuple[Any, Any]:
+    global _cross_encoder
+    with _cross_encoder_lock:
+        if _cross_encoder is None:
+            # Optional dependencies: only needed when RERANKER_BACKEND=cross_encoder.
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+
+            if not CROSS_ENCODER_ONNX_PATH:
+                raise RuntimeError("CROSS_ENCODER_ONNX_PATH is required for the cross_encoder reranker.")
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                CROSS_ENCODER_ONNX_PATH,
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+            tokenizer = AutoTokenizer.from_pretrained(CROSS_ENCODER_MODEL)
+            _cross_encoder = (tokenizer, session)
+    return _cross_encoder
+
+
+def rerank_with_cross_encoder(
+    query: str,
+    results: list[dict[str, Any]],
+    top_n: int = TOP_K,
+) -> list[dict[str, Any]]:
+    if not results:
+        return []
+
+    tokenizer, session = _get_cross_encoder()
+    encoded = tokenizer(
+        [query] * len(results),
+        [item.get("content", "")[:512] for item in results],
+        padding=True,
+        truncation=True,
+        max_length=512,
+        return_tensors="np",
+    )
+    input_names = {node.name for node in session.get_inputs()}
+    feed = {name: value for name, value in encoded.items() if name in input_names}
+    # Single batched forward pass; first logit per pair is the relevance score.
+    logits = session.run(None, feed)[0]
+    scores = logits.reshape(len(results), -1)[:, 0].tolist()
+    order = sorted(range(len(results)), key=lambda idx: scores[idx], reverse=True)
+    return [results[idx] for idx in order[:top_n]]
+
+
+def rerank_policies(
+    query: str,
+    results: list[dict[str, Any]],
+    issue_context: str,
+    top_n: int = TOP_K,
+) -> list[dict[str, Any]]:
+    """Rerank with the configured backend, falling back to the LLM reranker."""
+    if len(results) <= top_n:
+        return list(results)
+    if RERANKER_BACKEND == "cross_encoder":
+        try:
+            return rerank_with_cross_encoder(query=query, results=results, top_n=top_n)
+        except Exception as exc:
+            print(f"Warning: cross-encoder rerank failed, using LLM reranker: {exc}")
+    return rerank_with_llm(query=query, results=results, issue_context=issue_context, top_n=top_n)
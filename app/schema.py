@@ -3,8 +3,7 @@ Domain models for the Ticket Triage system.
 """
 
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ReviewStatus(str, Enum):
@@ -33,12 +32,16 @@ class RoutePath(str, Enum):
 
 class ReviewAction(BaseModel):
     """Action taken by Admin during review."""
+    model_config = ConfigDict(frozen=True)
+
     status: ReviewStatus
-    feedback: Optional[str] = Field(default=None, description="Admin feedback or suggested edits")
+    feedback: str | None = Field(default=None, description="Admin feedback or suggested edits")
 
 
 class OrderItem(BaseModel):
     """Item in an order."""
+    model_config = ConfigDict(frozen=True)
+
     sku: str
     name: str
     quantity: int
@@ -46,13 +49,15 @@ class OrderItem(BaseModel):
 
 class Order(BaseModel):
     """Order details from the orders database."""
+    model_config = ConfigDict(frozen=True)
+
     order_id: str
     customer_name: str
     email: str
     items: list[OrderItem]
     order_date: str
     status: str
-    delivery_date: Optional[str] = None
+    delivery_date: str | None = None
     total_amount: float
     currency: str = "USD"
 
@@ -60,52 +65,67 @@ class Order(BaseModel):
 class TriageInput(BaseModel):
     """Input for the triage endpoint."""
     ticket_text: str = Field(..., description="The customer's message/ticket text")
-    order_id: Optional[str] = Field(default=None, description="Order ID if known")
-    thread_id: Optional[str] = Field(default=None, description="Thread ID for continuing a conversation")
+    order_id: str | None = Field(default=None, description="Order ID if known")
+    thread_id: str | None = Field(default=None, description="Thread ID for continuing a conversation")
+
+
+class TriageBatchInput(BaseModel):
+    """Input for the batch triage endpoint."""
+    tickets: list[TriageInput] = Field(..., min_length=1, max_length=50, description="Tickets to triage concurrently")
 
 
 class TriageOutput(BaseModel):
     """Output from the triage endpoint."""
     thread_id: str
-    order_id: Optional[str] = None
-    email: Optional[str] = None
-    issue_type: Optional[str] = None
-    draft_scenario: Optional[DraftScenario] = None
-    draft_reply: Optional[str] = None
-    suggested_action: Optional[str] = Field(default=None, description="Template action awaiting admin approval")
-    policy_evaluation: Optional[str] = Field(default=None, description="Policy compliance summary for suggested action")
-    applied_policies: Optional[list[dict]] = Field(default=None, description="Policies used with cited rules for UI display")
-    confidence_score: Optional[float] = Field(default=None, description="Decision confidence score from decision_maker (0.0-1.0)")
-    decision_action: Optional[str] = Field(default=None, description="Decision maker action: approve or reject")
-    decision_reasoning: Optional[str] = Field(default=None, description="Decision rationale for audit/logging")
-    review_status: Optional[ReviewStatus] = None
-    evidence: Optional[str] = None
-    recommendation: Optional[str] = None
-    candidate_orders: Optional[list[dict]] = None
+    order_id: str | None = None
+    email: str | None = None
+    issue_type: str | None = None
+    draft_scenario: DraftScenario | None = None
+    draft_reply: str | None = None
+    suggested_action: str | None = Field(default=None, description="Template action awaiting admin approval")
+    policy_evaluation: str | None = Field(default=None, description="Policy compliance summary for suggested action")
+    applied_policies: list[dict] | None = Field(default=None, description="Policies used with cited rules for UI display")
+    confidence_score: float | None = Field(default=None, description="Decision confidence score from decision_maker (0.0-1.0)")
+    decision_action: str | None = Field(default=None, description="Decision maker action: approve or reject")
+    decision_reasoning: str | None = Field(default=None, description="Decision rationale for audit/logging")
+    review_status: ReviewStatus | None = None
+    evidence: str | None = None
+    recommendation: str | None = None
+    candidate_orders: list[dict] | None = None
     messages: list[dict] = Field(default_factory=list)
     # Backward compatibility fields (from original API)
-    order: Optional[dict] = Field(default=None, description="Full order object (backward compatibility)")
-    reply_text: Optional[str] = Field(default=None, description="Alias for draft_reply (backward compatibility)")
+    order: dict | None = Field(default=None, description="Full order object (backward compatibility)")
+    reply_text: str | None = Field(default=None, description="Alias for draft_reply (backward compatibility)")
+
+
+class TriageBatchItem(BaseModel):
+    """One entry of the batch triage response: the ticket's result or its error."""
+    index: int = Field(..., description="Position of the ticket in the request")
+    thread_id: str
+    result: TriageOutput | None = None
+    error: str | None = None
 
 
 class AdminReviewInput(BaseModel):
     """Input for the admin review endpoint."""
+    model_config = ConfigDict(frozen=True)
+
     action: ReviewAction
 
 
 class PendingTicket(BaseModel):
     """Ticket awaiting admin approval."""
     thread_id: str
-    order_id: Optional[str] = None
-    customer_name: Optional[str] = None
-    issue_type: Optional[str] = None
-    suggested_action: Optional[str] = None
-    applied_policies: Optional[list[dict]] = None
-    confidence_score: Optional[float] = None
-    decision_action: Optional[str] = None
-    decision_reasoning: Optional[str] = None
-    draft_reply: Optional[str] = None
-    created_at: Optional[str] = None
+    order_id: str | None = None
+    customer_name: str | None = None
+    issue_type: str | None = None
+    suggested_action: str | None = None
+    applied_policies: list[dict] | None = None
+    confidence_score: float | None = None
+    decision_action: str | None = None
+    decision_reasoning: str | None = None
+    draft_reply: str | None = None
+    created_at: str | None = None
 
 
 class PendingTicketsResponse(BaseModel):
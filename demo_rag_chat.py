@@ -14,8 +14,13 @@ import json
 import sys
 from typing import Any
 
+import orjson
 import requests
 
+# One pooled session so every turn reuses the same keep-alive connection.
+_session = requests.Session()
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 def print_json(title: str, payload: Any) -> None:
     print(f"\n{title}")
@@ -26,9 +31,14 @@ def call_triage(base_url: str, ticket_text: str, thread_id: str | None) -> dict[
     body: dict[str, Any] = {"ticket_text": ticket_text}
     if thread_id:
         body["thread_id"] = thread_id
-    resp = requests.post(f"{base_url}/triage/invoke", json=body, timeout=60)
+    resp = _session.post(
+        f"{base_url}/triage/invoke",
+        data=orjson.dumps(body),
+        headers=_JSON_HEADERS,
+        timeout=60,
+    )
     resp.raise_for_status()
-    return resp.json()
+    return orjson.loads(resp.content)
 
 
 def call_admin_review(
@@ -40,14 +50,15 @@ def call_admin_review(
     payload: dict[str, Any] = {"action": {"status": status}}
     if feedback:
         payload["action"]["feedback"] = feedback
-    resp = requests.post(
+    resp = _session.post(
         f"{base_url}/admin/review",
         params={"thread_id": thread_id},
-        json=payload,
+        data=orjson.dumps(payload),
+        headers=_JSON_HEADERS,
         timeout=60,
     )
     resp.raise_for_status()
-    return resp.json()
+    return orjson.loads(resp.content)
 
 
 def render_triage_response(data: dict[str, Any]) -> None:
@@ -120,9 +131,9 @@ def repl(base_url: str, auto_approve: bool) -> int:
             return 0
 
         if user_text == "/pending":
-            resp = requests.get(f"{base_url}/admin/review", timeout=30)
+            resp = _session.get(f"{base_url}/admin/review", timeout=30)
             resp.raise_for_status()
-            print_json("Pending tickets", resp.json())
+            print_json("Pending tickets", orjson.loads(resp.content))
             continue
 
         try:
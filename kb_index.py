@@ -5,17 +5,29 @@ CLI for indexing and inspecting the policy knowledge base.
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
 import os
+import sqlite3
+from contextlib import closing
 
+import orjson
 from dotenv import load_dotenv
 
-from app.rag import index_policies, list_indexed_policies, query_policies, upsert_policy_document
+from app.rag import (
+    index_policies,
+    list_indexed_policies,
+    query_policies,
+    read_index_version,
+    upsert_policy_document,
+)
 from app.rag.config import POLICIES_DIR
 
 # Ensure CLI picks up OPENAI_API_KEY and other env vars from .env.
 load_dotenv()
 
+# Persistent query cache so repeated CLI queries skip the embedding call and vector search.
+QUERY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "kbq.sqlite")
+
 
 def cmd_index(args: argparse.Namespace) -> None:
     policies_dir = args.policies_dir or POLICIES_DIR
@@ -34,14 +46,37 @@ def cmd_list(_: argparse.Namespace) -> None:
     if not docs:
         print("No policies are currently indexed.")
         return
-    print(json.dumps(docs, indent=2))
+    print(orjson.dumps(docs, option=orjson.OPT_INDENT_2).decode())
+
+
+def _open_query_cache() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(QUERY_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(QUERY_CACHE_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+    return conn
+
+
+def _cached_query(issue_type: str | None, query_text: str, top_k: int) -> list[dict]:
+    key = hashlib.sha1(f"{issue_type}|{query_text}|{top_k}|{read_index_version()}".encode("utf-8")).hexdigest()
+    with closing(_open_query_cache()) as conn:
+        row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+    if row is not None:
+        return orjson.loads(row[0])
+    # The cache connection stays closed while the query embeds and searches.
+    result = query_policies(issue_type=issue_type, query_text=query_text, top_k=top_k)
+    with closing(_open_query_cache()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, orjson.dumps(result)))
+    return result
 
 
 def cmd_query(args: argparse.Namespace) -> None:
     issue_type = args.issue_type
     query_text = args.text
-    result = query_policies(issue_type=issue_type, query_text=query_text, top_k=args.top_k)
-    print(json.dumps(result, indent=2))
+    if args.no_cache:
+        result = query_policies(issue_type=issue_type, query_text=query_text, top_k=args.top_k)
+    else:
+        result = _cached_query(issue_type, query_text, args.top_k)
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -63,6 +98,7 @@ def build_parser() -> argparse.ArgumentParser:
     p_query.add_argument("--text", required=True, help="Query text")
     p_query.add_argument("--issue-type", default=None, help="Issue type for filtered retrieval")
     p_query.add_argument("--top-k", type=int, default=3, help="Number of results")
+    p_query.add_argument("--no-cache", action="store_true", help=f"Bypass the result cache at {QUERY_CACHE_PATH}")
     p_query.set_defaults(func=cmd_query)
 
     return parser
@@ -1,18 +1,146 @@
 #!/usr/bin/env python3
-import os, json
-def chunk(t, size=400):
-    b, parts = "", []
+import argparse
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+try:  # orjson is optional; it's a C encoder, much faster than json on big indexes
+    import orjson
+
+    def dumps(x, pretty=False):
+        return orjson.dumps(x, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    loads = orjson.loads
+except ImportError:
+    def dumps(x, pretty=False):
+        return json.dumps(x, indent=2 if pretty else None)
+    loads = json.loads
+def chunk(t, size=400, stride=300):
+    # Each new chunk starts with the last (size - stride) chars of the previous one.
+    # Chunks are slices t[a:e]: e is the last line end within a+size (rfind), or the
+    # end of the first new line if that alone is too long; a trails e by the overlap.
+    overlap = max(0, size-stride)
+    parts, a, s, n = [], 0, 0, len(t)
+    while s < n:
+        if n-a <= size:
+            e = n
+        else:
+            p = t.rfind("\n", s, a+size)
+            if p < 0:
+                p = t.find("\n", s)
+            e = p+1 if p >= 0 else n
+        parts.append(t[a:e])
+        a, s = (max(a, e-overlap) if overlap else e), e
+    return parts
+def chunk_tokens(t, enc, size=150, stride=100):
+    # Same overlap scheme as chunk(), but size/stride count tokens of the embedding model.
+    overlap = max(0, size-stride)
+    buf, parts = [], []
     for line in t.splitlines(True):
-        if len(b)+len(line)>size: parts.append(b); b=""
-        b += line
-    if b: parts.append(b)
+        toks = enc.encode(line, disallowed_special=())
+        if len(buf)+len(toks)>size and buf:
+            parts.append(enc.decode(buf))
+            buf = buf[-overlap:] if overlap else []
+        buf += toks
+    if buf:
+        parts.append(enc.decode(buf))
     return parts
-docs=[]
-os.makedirs("mock_data", exist_ok=True)
-for f in os.listdir("mock_data/policies"):
-    if f.endswith(".md"):
-        txt=open(os.path.join("mock_data/policies", f),"r",encoding="utf-8").read()
-        for i,c in enumerate(chunk(txt)):
-            docs.append({"doc_id": f"{f}#chunk-{i+1}", "file": f, "text": c})
-json.dump({"docs": docs}, open("mock_data/policy_index.json","w",encoding="utf-8"), indent=2)
-print("Indexed", len(docs),"chunks")
\ No newline at end of file
+def read_file(p):
+    with open(p,"r",encoding="utf-8") as fh:
+        return os.path.basename(p), fh.read()
+def load_json(p, default):
+    try:
+        with open(p,"rb") as fh:
+            return loads(fh.read())
+    except (OSError, ValueError):
+        return default
+def write_atomic(p, obj):
+    tmp = p + ".tmp"
+    with open(tmp,"w",encoding="utf-8") as fh:
+        fh.write(dumps(obj, pretty=True))
+    os.replace(tmp, p)
+def write_index(p, docs, pretty=False):
+    # Stream entries one at a time instead of serialising the whole index in one buffer.
+    tmp, n = p + ".tmp", 0
+    with open(tmp,"w",encoding="utf-8") as fh:
+        fh.write('{"docs":[')
+        for n, d in enumerate(docs, 1):
+            fh.write(("," if n > 1 else "") + ("\n" if pretty else "") + dumps(d, pretty))
+        fh.write("\n]}" if pretty else "]}")
+    os.replace(tmp, p)
+    return n
+def read_ahead(pool, paths, depth=16):
+    # Keep at most `depth` reads in flight so file texts don't pile up ahead of the writer.
+    pending = deque()
+    for p in paths:
+        pending.append(pool.submit(read_file, p))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+INDEX, MANIFEST = "mock_data/policy_index.json", "mock_data/policy_index.manifest.json"
+def main():
+    ap = argparse.ArgumentParser(description="Chunk mock_data/policies into mock_data/policy_index.json")
+    ap.add_argument("--size", type=int, help="Max chunk size (default 400 chars, or 150 with --tokens)")
+    ap.add_argument("--stride", type=int, help="Chunk start spacing; size-stride units overlap (default 300, or 100 with --tokens)")
+    ap.add_argument("--tokens", action="store_true", help="Measure --size/--stride in text-embedding-3-small tokens (needs tiktoken)")
+    ap.add_argument("--pretty", action="store_true", help="Indent index entries (larger, slower)")
+    args = ap.parse_args()
+    if args.size is None:
+        args.size = 150 if args.tokens else 400
+    if args.stride is None:
+        args.stride = 100 if args.tokens else 300
+    if not 0 < args.stride <= args.size:
+        ap.error("--stride must be in (0, --size]")
+    enc = None
+    if args.tokens:
+        try:
+            import tiktoken
+        except ImportError:
+            ap.error("--tokens requires tiktoken (pip install tiktoken)")
+        enc = tiktoken.encoding_for_model("text-embedding-3-small")  # built once, reused for every file
+    def split(txt):
+        if enc is None:
+            return chunk(txt, args.size, args.stride)
+        return chunk_tokens(txt, enc, args.size, args.stride)
+    os.makedirs("mock_data", exist_ok=True)
+    # Manifest: filename -> (mtime_ns, size, sha256) from the last run with the same chunk params.
+    # Files whose fingerprint still matches reuse their chunks from the existing index.
+    params = {"size": args.size, "stride": args.stride, "tokens": args.tokens}
+    manifest = load_json(MANIFEST, {})
+    old = manifest.get("files", {}) if manifest.get("params") == params else {}
+    prev = {}
+    for d in (load_json(INDEX, {}).get("docs", []) if old else []):
+        prev.setdefault(d["file"], []).append(d)
+    with os.scandir("mock_data/policies") as it:
+        entries = {e.path: e.stat() for e in it if e.name.endswith(".md") and e.is_file()}
+    files, todo = {}, []
+    for path, st in sorted(entries.items()):
+        f, m = os.path.basename(path), old.get(os.path.basename(path))
+        if m and f in prev and m["mtime_ns"] == st.st_mtime_ns and m["size"] == st.st_size:
+            files[f] = m
+        else:
+            todo.append(path)
+    def docs(reads):
+        # Yields one file's chunks at a time, so only the file being written is held in
+        # memory; reused chunks are popped from prev as they are written.
+        for path in sorted(entries):
+            f = os.path.basename(path)
+            if f in files:
+                yield from prev.pop(f)
+                continue
+            f, txt = next(reads)
+            st, sha, m = entries[path], hashlib.sha256(txt.encode("utf-8")).hexdigest(), old.get(f)
+            files[f] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": sha}
+            if m and f in prev and m["sha256"] == sha:
+                yield from prev.pop(f)  # touched, not changed
+                continue
+            for i, c in enumerate(split(txt)):
+                yield {"doc_id": f"{f}#chunk-{i+1}", "file": f, "text": c}
+    # Reads are I/O-bound, so overlap them; chunking stays sequential.
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        n = write_index(INDEX, docs(read_ahead(pool, todo)), args.pretty)
+    write_atomic(MANIFEST, {"params": params, "files": files})
+    print("Indexed", n,"chunks", f"({len(todo)} of {len(entries)} files re-read)")
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import os, psycopg
+from psycopg.rows import tuple_row
 from dotenv import load_dotenv
 load_dotenv()
 u=os.environ['DATABASE_URL']
 print('DATABASE_URL=',u)
-conn=psycopg.connect(u)
-cur=conn.cursor()
-cur.execute("select current_database(), current_user, inet_server_addr(), inet_server_port()")
-print('TARGET=',cur.fetchone())
-cur.execute("select table_schema, table_name from information_schema.tables where table_schema not in ('pg_catalog','information_schema') order by 1,2")
-rows=cur.fetchall()
-print('TABLES=',rows)
-conn.close()
\ No newline at end of file
+with psycopg.connect(u, row_factory=tuple_row) as conn:
+    conn.execute("SET LOCAL statement_timeout = '5s'")  # fail fast instead of hanging
+    print('TARGET=',conn.execute("select current_database(), current_user, inet_server_addr(), inet_server_port()").fetchone())
+    # Server-side cursor streams the table list in batches instead of fetching it all at once
+    with conn.cursor(name="scan") as cur:
+        cur.itersize=500
+        cur.execute("select table_schema, table_name from information_schema.tables where table_schema not in ('pg_catalog','information_schema') order by 1,2")
+        # Print rows as they arrive, in the same "TABLES= [(...), ...]" shape as before
+        print('TABLES= [', end='')
+        for i, row in enumerate(cur):
+            print(', ' if i else '', row, sep='', end='')
+        print(']')
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app.graph  # noqa: F401  (import order as in app.main; rag_nodes imports app.graph.state)
+from app.rag import rag_nodes, retriever
+from app.rag.config import RERANK_POOL_FACTOR, TOP_K
+from app.schema import DraftScenario
+
+SOURCES = ["refund_policy.md", "chargeback_policy.md", "delivery_policy.md", "warranty_policy.md", "fraud_policy.md"]
+# Reranker scores by source: the reverse of retrieval order, so a rerank is visible.
+SCORES = {"refund_policy.md": 1, "chargeback_policy.md": 3, "delivery_policy.md": 5, "warranty_policy.md": 7, "fraud_policy.md": 9}
+
+
+class FakeRerankLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        self.prompts.extend(prompts)
+        return [SimpleNamespace(content=str(self._score(prompt))) for prompt in prompts]
+
+    @staticmethod
+    def _score(prompt):
+        return next(score for source, score in SCORES.items() if f"Document ({source})" in prompt)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeRerankLLM()
+    monkeypatch.setattr(retriever, "RERANKER_BACKEND", "llm")
+    monkeypatch.setattr(retriever, "_get_rerank_llm", lambda: llm)
+    retriever._rerank_cache.clear()
+    return llm
+
+
+@pytest.fixture
+def candidates():
+    return [
+        {"source": source, "title": source, "content": f"{source} rules", "relevance_score": 1.0 - i / 10}
+        for i, source in enumerate(SOURCES)
+    ]
+
+
+def _reply_state():
+    return {
+        "issue_type": "refund_request",
+        "draft_scenario": DraftScenario.REPLY,
+        "suggested_action": "Issue a refund",
+        "ticket_text": "I want my money back",
+        "order_details": {"total_amount": 42},
+    }
+
+
+def test_kb_orchestrator_reranks_a_larger_candidate_pool(monkeypatch, fake_llm, candidates):
+    calls = []
+
+    def fake_query_policies(**kwargs):
+        calls.append(kwargs)
+        return [dict(item) for item in candidates][: kwargs["top_k"]]
+
+    monkeypatch.setattr(rag_nodes, "query_policies", fake_query_policies)
+
+    result = rag_nodes.kb_orchestrator(_reply_state())
+
+    assert calls[0]["top_k"] == TOP_K * RERANK_POOL_FACTOR
+    assert len(fake_llm.prompts) == len(candidates)
+    assert [c["source"] for c in result["policy_citations"]] == [
+        "fraud_policy.md",
+        "warranty_policy.md",
+        "delivery_policy.md",
+    ]
+
+
+def test_rerank_policies_skips_model_when_nothing_would_be_dropped(fake_llm, candidates):
+    ranked = retriever.rerank_policies("q", candidates[:TOP_K], "ctx", top_n=TOP_K)
+
+    assert ranked == candidates[:TOP_K]
+    assert fake_llm.prompts == []
+
+
+def test_rerank_policies_reuses_cached_order(fake_llm, candidates):
+    first = retriever.rerank_policies("q", candidates, "ctx", top_n=TOP_K)
+    prompts_after_first = len(fake_llm.prompts)
+    second = retriever.rerank_policies("q", list(reversed(candidates)), "ctx", top_n=TOP_K)
+
+    assert [c["source"] for c in second] == [c["source"] for c in first]
+    assert len(fake_llm.prompts) == prompts_after_first
@@ -0,0 +1,77 @@
+import pytest
+from langgraph.graph import END
+
+from app.graph import ROUTERS
+from app.graph.workflow import _DRAFT_ROUTES
+from app.schema import DraftScenario, ReviewStatus, RoutePath
+
+
+@pytest.mark.parametrize(
+    ("state", "expected"),
+    [
+        ({}, "classify_resolve_and_prepare"),
+        ({"route_path": RoutePath.FULL}, "classify_resolve_and_prepare"),
+        ({"route_path": RoutePath.RECLASSIFY}, "classify_resolve_and_prepare"),
+        ({"route_path": RoutePath.RESOLVE}, "resolve_and_prepare"),
+        ({"route_path": RoutePath.DRAFT}, "draft_reply"),
+        ({"route_path": "resolve"}, "resolve_and_prepare"),
+    ],
+)
+def test_after_ingest(state, expected):
+    assert ROUTERS["after_ingest"](state) == expected
+
+
+def _expected_after_draft(scenario, review_status):
+    if scenario != DraftScenario.REPLY:
+        return END
+    if review_status in (ReviewStatus.APPROVED, ReviewStatus.REJECTED):
+        return "finalize"
+    return "admin_review"
+
+
+@pytest.mark.parametrize("scenario", [None, *DraftScenario])
+@pytest.mark.parametrize("review_status", [None, *ReviewStatus])
+def test_after_draft_covers_every_pair(scenario, review_status):
+    expected = _expected_after_draft(scenario, review_status)
+    assert _DRAFT_ROUTES[(scenario, review_status)] == expected
+    state = {"draft_scenario": scenario, "review_status": review_status}
+    assert ROUTERS["after_draft"](state) == expected
+
+
+def test_draft_routes_table_is_complete():
+    assert len(_DRAFT_ROUTES) == (len(DraftScenario) + 1) * (len(ReviewStatus) + 1)
+
+
+@pytest.mark.parametrize(
+    ("state", "expected"),
+    [
+        # Checkpointed state may hold plain strings instead of enum members.
+        ({"draft_scenario": "reply", "review_status": "approved"}, "finalize"),
+        ({"draft_scenario": "reply", "review_status": "pending"}, "admin_review"),
+        ({"draft_scenario": "confirm_order", "review_status": "rejected"}, END),
+        ({}, END),
+        # Values outside the table fall back to the direct computation.
+        ({"draft_scenario": DraftScenario.REPLY, "review_status": "escalated"}, "admin_review"),
+        ({"draft_scenario": "unknown"}, END),
+    ],
+)
+def test_after_draft_plain_and_unexpected_values(state, expected):
+    assert ROUTERS["after_draft"](state) == expected
+
+
+@pytest.mark.parametrize(
+    ("scenario", "expected"),
+    [
+        (DraftScenario.REPLY, "kb_orchestrator"),
+        ("reply", "kb_orchestrator"),
+        (DraftScenario.NEED_IDENTIFIER, "draft_reply"),
+        (DraftScenario.CONFIRM_ORDER, "draft_reply"),
+        (None, "draft_reply"),
+    ],
+)
+def test_to_rag(scenario, expected):
+    assert ROUTERS["to_rag"]({"draft_scenario": scenario}) == expected
+
+
+def test_routers_table():
+    assert set(ROUTERS) == {"after_ingest", "after_draft", "to_rag"}